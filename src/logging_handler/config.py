@@ -1,6 +1,7 @@
 # src/logging_handler/config.py
 from typing import Optional
 import os
+from .routing import parse_routes
 
 class Config:
     def __init__(self):
@@ -16,10 +17,28 @@ class Config:
         self.SPLUNK_TIMEOUT = int(os.getenv("SPLUNK_TIMEOUT", "2"))
         self.SPLUNK_VERIFY_SSL = os.getenv("SPLUNK_VERIFY_SSL", "true").lower() == "true"
         self.SPLUNK_BATCH_SIZE = int(os.getenv("SPLUNK_BATCH_SIZE", "10"))
+        self.SPLUNK_LINGER_MS = int(os.getenv("SPLUNK_LINGER_MS", "1000"))
+        
+        # Routing rules (JSON) - see Router.from_config
+        self.SPLUNK_ROUTES = os.getenv("SPLUNK_ROUTES")
+        
+        # Transport settings - "hec" posts to Splunk, "file" writes NDJSON for a forwarder
+        self.SPLUNK_EVENTS_TRANSPORT = os.getenv("SPLUNK_EVENTS_TRANSPORT", "hec").lower()
+        self.SPLUNK_METRICS_TRANSPORT = os.getenv("SPLUNK_METRICS_TRANSPORT", "hec").lower()
+        
+        # File sink settings
+        self.FILE_SINK_DIR = os.getenv("FILE_SINK_DIR", "logs")
+        self.FILE_SINK_MAX_BYTES = int(os.getenv("FILE_SINK_MAX_BYTES", str(100 * 1024 * 1024)))
+        self.FILE_SINK_ROTATE_INTERVAL = int(os.getenv("FILE_SINK_ROTATE_INTERVAL", "3600"))
+        self.FILE_SINK_COMPRESS = os.getenv("FILE_SINK_COMPRESS", "false").lower() == "true"
+        self.FILE_SINK_MAX_TOTAL_BYTES = int(os.getenv("FILE_SINK_MAX_TOTAL_BYTES", str(1024 * 1024 * 1024)))
+        self.FILE_SINK_BUFFER_SIZE = int(os.getenv("FILE_SINK_BUFFER_SIZE", str(1024 * 1024)))
+        self.FILE_SINK_FLUSH_INTERVAL = float(os.getenv("FILE_SINK_FLUSH_INTERVAL", "1"))
         
         # Performance settings
         self.ENABLE_ASYNC = os.getenv("ENABLE_ASYNC", "false").lower() == "true"
         self.MAX_QUEUE_SIZE = int(os.getenv("MAX_QUEUE_SIZE", "10000"))
+        self.MAX_QUEUE_BYTES = int(os.getenv("MAX_QUEUE_BYTES", str(64 * 1024 * 1024)))
         
         self.validate()
     
@@ -39,14 +58,23 @@ class Config:
     
     def _validate_splunk_config(self):
         """Validate Splunk-specific configuration"""
-        if not self.SPLUNK_URL:
-            raise ValueError("SPLUNK_HOST is required")
+        for transport in (self.SPLUNK_EVENTS_TRANSPORT, self.SPLUNK_METRICS_TRANSPORT):
+            if transport not in ["hec", "file"]:
+                raise ValueError(f"Invalid transport: {transport}")
+        
+        # Tokens are only needed for endpoints that post to HEC
+        if self.SPLUNK_EVENTS_TRANSPORT == "hec" or self.SPLUNK_METRICS_TRANSPORT == "hec":
+            if not self.SPLUNK_URL:
+                raise ValueError("SPLUNK_HOST is required")
             
-        if not self.SPLUNK_EVENTS_TOKEN:
+        if self.SPLUNK_EVENTS_TRANSPORT == "hec" and not self.SPLUNK_EVENTS_TOKEN:
             raise ValueError("SPLUNK_EVENTS_TOKEN is required")
             
-        if not self.SPLUNK_METRICS_TOKEN:
+        if self.SPLUNK_METRICS_TRANSPORT == "hec" and not self.SPLUNK_METRICS_TOKEN:
             raise ValueError("SPLUNK_METRICS_TOKEN is required")
+            
+        if self.SPLUNK_ROUTES:
+            parse_routes(self.SPLUNK_ROUTES)
 
     @classmethod
     def as_dict(cls):
@@ -0,0 +1,224 @@
+import atexit
+import gzip
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List
+
+
+class FileSink:
+    """
+    Writes HEC-shaped events as NDJSON to a local file for pickup by a
+    Splunk Universal Forwarder or Fluent Bit sidecar.
+
+    The active segment is rotated by size and age, rotated segments can be
+    gzipped, and the oldest segments are removed once the directory exceeds
+    its disk budget. The write buffer is flushed every `flush_interval`
+    seconds so forwarders see events without waiting for it to fill.
+    Compression and pruning run on a background thread, never under the
+    write lock.
+
+    Segment names include the pid, so several processes can share a
+    directory. Within a process, use `FileSink.get` to share one sink per path.
+    """
+    _sinks: Dict[str, 'FileSink'] = {}
+    _sinks_lock = threading.Lock()
+
+    def __init__(self, directory: str, name: str,
+                 max_bytes: int = 100 * 1024 * 1024,
+                 rotate_interval: int = 3600,
+                 compress: bool = False,
+                 max_total_bytes: int = 1024 * 1024 * 1024,
+                 buffer_size: int = 1024 * 1024,
+                 flush_interval: float = 1.0):
+        self.directory = directory
+        self.base_name = name
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.compress = compress
+        self.max_total_bytes = max_total_bytes
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._segment_pattern = re.compile(rf"^{re.escape(name)}-\d+-(\d+T\d+)\.ndjson(\.gz)?$")
+        self._set_name()
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self._opened_at = 0.0
+        self._closed = threading.Event()
+        self._wake = threading.Event()
+        self._rotated: List[str] = []  # segments awaiting compression and pruning
+        self._rotated_lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._open()
+        self._start_worker()
+        atexit.register(self.close)
+        os.register_at_fork(before=self.flush, after_in_child=self._after_fork)
+
+    @classmethod
+    def get(cls, directory: str, name: str, **settings: Any) -> 'FileSink':
+        """Return the shared sink for this directory and name, creating it if needed"""
+        key = os.path.join(os.path.abspath(directory), name)
+        with cls._sinks_lock:
+            sink = cls._sinks.get(key)
+            if sink is None or sink._closed.is_set():
+                sink = cls._sinks[key] = cls(directory, name, **settings)
+            return sink
+
+    def _set_name(self) -> None:
+        self.name = f"{self.base_name}-{os.getpid()}"
+        self.path = os.path.join(self.directory, f"{self.name}.ndjson")
+
+    def _start_worker(self) -> None:
+        threading.Thread(target=self._worker_loop, name=f"file-sink-{self.name}", daemon=True).start()
+
+    def _after_fork(self) -> None:
+        """Give a forked child its own segment - the buffer was flushed before the fork"""
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._rotated = []  # the parent processes its own segments
+        self._rotated_lock = threading.Lock()
+        if self._closed.is_set():
+            return
+        if self._file and not self._file.closed:
+            self._file.close()
+        self._set_name()
+        self._open()
+        self._start_worker()
+
+    def _open(self) -> None:
+        """Open the active segment with a large write buffer"""
+        self._file = open(self.path, "ab", buffering=self.buffer_size)
+        self._size = self._file.tell()
+        self._opened_at = time.monotonic()
+
+    def write_bytes(self, data: bytes) -> None:
+        """Append already-serialized NDJSON in a single write"""
+        with self._lock:
+            if self._should_rotate(len(data)):
+                self._rotate()
+            self._file.write(data)
+            self._size += len(data)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file and not self._file.closed:
+                self._file.flush()
+
+    def _worker_loop(self) -> None:
+        """Flush the buffer on a timer and compress/prune segments after rotation"""
+        timeout = self.flush_interval if self.flush_interval > 0 else None
+        while not self._closed.is_set():
+            self._wake.wait(timeout)
+            self._wake.clear()
+            if self.flush_interval > 0:
+                self.flush()
+            self._process_rotated()
+
+    def close(self) -> None:
+        self._closed.set()
+        self._wake.set()
+        with self._lock:
+            if self._file and not self._file.closed:
+                self._file.close()
+        self._process_rotated()
+
+    def _should_rotate(self, incoming: int) -> bool:
+        if self._size == 0:
+            return False
+        if self.max_bytes and self._size + incoming > self.max_bytes:
+            return True
+        if self.rotate_interval and time.monotonic() - self._opened_at >= self.rotate_interval:
+            return True
+        return False
+
+    def _rotate(self) -> None:
+        """Close the active segment, move it aside and start a new one"""
+        self._file.close()
+
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        rotated = os.path.join(self.directory, f"{self.name}-{stamp}.ndjson")
+        os.replace(self.path, rotated)
+        self._open()
+
+        with self._rotated_lock:
+            self._rotated.append(rotated)
+        self._wake.set()
+
+    def _process_rotated(self) -> None:
+        """Compress rotated segments and enforce the disk budget"""
+        processed = False
+        while True:
+            with self._rotated_lock:
+                if not self._rotated:
+                    break
+                rotated = self._rotated.pop(0)
+            processed = True
+            if self.compress:
+                self._compress(rotated)
+
+        if processed:
+            self._enforce_budget()
+
+    def _compress(self, rotated: str) -> None:
+        try:
+            with open(rotated, "rb") as src, gzip.open(f"{rotated}.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+        except FileNotFoundError:  # pruned by another process
+            pass
+        except OSError as e:
+            logging.getLogger('splunk_fallback').error(f"Failed to compress {rotated}: {str(e)}")
+            if os.path.exists(rotated) and os.path.exists(f"{rotated}.gz"):
+                os.remove(f"{rotated}.gz")
+
+    def _enforce_budget(self) -> None:
+        """
+        Delete the oldest rotated segments, from any process, until the
+        directory fits the disk budget
+        """
+        if not self.max_total_bytes:
+            return
+
+        segments = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.startswith(f"{self.base_name}-"):
+                continue
+            try:
+                size = entry.stat().st_size
+            except FileNotFoundError:  # removed by another process
+                continue
+            total += size
+            if match := self._segment_pattern.match(entry.name):
+                segments.append((match.group(1), entry.path, size))
+        segments.sort()  # oldest timestamp first
+
+        for _, path, size in segments:
+            if total <= self.max_total_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    @classmethod
+    def from_config(cls, config: Any, endpoint: str) -> 'FileSink':
+        """Get the shared sink for the given endpoint type from Config settings"""
+        return cls.get(
+            directory=config.FILE_SINK_DIR,
+            name="metrics" if endpoint == "metric" else "events",
+            max_bytes=config.FILE_SINK_MAX_BYTES,
+            rotate_interval=config.FILE_SINK_ROTATE_INTERVAL,
+            compress=config.FILE_SINK_COMPRESS,
+            max_total_bytes=config.FILE_SINK_MAX_TOTAL_BYTES,
+            buffer_size=config.FILE_SINK_BUFFER_SIZE,
+            flush_interval=config.FILE_SINK_FLUSH_INTERVAL,
+        )
@@ -27,7 +27,8 @@ class AppLogger(BaseLogger):
             self.logger.addHandler(console_handler)
             
         # Add Splunk handler if configured
-        if self.config.SPLUNK_URL and self.config.SPLUNK_EVENTS_TOKEN:
+        if (self.config.SPLUNK_EVENTS_TRANSPORT == "file"
+                or (self.config.SPLUNK_URL and self.config.SPLUNK_EVENTS_TOKEN)):
             from .splunk_logger import SafeSplunkLogger
             self.splunk_logger = SafeSplunkLogger()
         else:
@@ -57,6 +58,10 @@ class AppLogger(BaseLogger):
             except Exception as e:
                 self.logger.error(f"Failed to log to Splunk: {str(e)}")
 
+    def queue_stats(self) -> Dict[str, Any]:
+        """Report memory usage of the Splunk queues"""
+        return self.splunk_logger.queue_stats() if self.splunk_logger else {}
+
     # Convenience methods
     def debug(self, message: str, context: Optional[Dict[str, Any]] = None, exc_info: Optional[Exception] = None) -> None:
         self._log('debug', message, context, exc_info)
@@ -0,0 +1,197 @@
+import json
+from typing import Dict, Any, List, Optional
+
+DEFAULT_DESTINATIONS = {"event": "events", "metric": "metrics"}
+DESTINATION_SETTINGS = {"token", "index", "source", "sourcetype", "batch_size", "linger_ms"}
+
+
+def parse_routes(raw: str) -> Dict[str, Any]:
+    """Parse and validate a SPLUNK_ROUTES document, raising ValueError if it is malformed"""
+    try:
+        routes = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid SPLUNK_ROUTES: {str(e)}") from e
+
+    if not isinstance(routes, dict):
+        raise ValueError("Invalid SPLUNK_ROUTES: expected an object")
+
+    destinations = routes.setdefault("destinations", {})
+    if not isinstance(destinations, dict):
+        raise ValueError("Invalid SPLUNK_ROUTES: destinations must be an object")
+
+    for name, settings in destinations.items():
+        if not isinstance(settings, dict):
+            raise ValueError(f"Invalid routing destination {name}: settings must be an object")
+        if unknown := set(settings) - DESTINATION_SETTINGS:
+            raise ValueError(f"Invalid routing destination {name}: unknown settings {sorted(unknown)}")
+        for key in ("batch_size", "linger_ms"):
+            if key in settings and (isinstance(settings[key], bool) or not isinstance(settings[key], int)):
+                raise ValueError(f"Invalid routing destination {name}: {key} must be an integer")
+
+    rules = routes.setdefault("rules", [])
+    if not isinstance(rules, list):
+        raise ValueError("Invalid SPLUNK_ROUTES: rules must be a list")
+
+    for i, rule in enumerate(rules):
+        if not isinstance(rule, dict):
+            raise ValueError(f"Invalid routing rule {i}: expected an object")
+
+        endpoint = rule.get("endpoint")
+        if endpoint not in (None, *DEFAULT_DESTINATIONS):
+            raise ValueError(f"Invalid routing rule {i}: unknown endpoint {endpoint}")
+
+        # Rules may also target the default destination of their endpoint
+        destination = rule.get("destination")
+        if destination not in destinations and (endpoint is None or destination != DEFAULT_DESTINATIONS[endpoint]):
+            raise ValueError(f"Invalid routing rule {i}: unknown destination {destination}")
+
+        match = rule.setdefault("match", {})
+        if not isinstance(match, dict):
+            raise ValueError(f"Invalid routing rule {i}: match must be an object")
+        for key, value in match.items():
+            values = value if isinstance(value, list) else [value]
+            if any(isinstance(v, (dict, list)) for v in values):
+                raise ValueError(f"Invalid routing rule {i}: match value for {key} must be a value or list of values")
+
+    return routes
+
+
+class Destination:
+    """
+    A Splunk destination - token, index, source and sourcetype - with its
+    own batching settings. Each destination gets a separate batch queue.
+    """
+    def __init__(self, name: str, token: Optional[str] = None, index: Optional[str] = None,
+                 source: Optional[str] = None, sourcetype: Optional[str] = None,
+                 batch_size: int = 10, linger_ms: int = 1000):
+        self.name = name
+        self.token = token
+        self.index = index
+        self.source = source
+        self.sourcetype = sourcetype
+        self.batch_size = max(1, batch_size)
+        self.linger_ms = max(0, linger_ms)
+        self.headers = {
+            "Authorization": f"Splunk {token}",
+            "Content-Type": "application/json"
+        }
+
+    def apply(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Stamp HEC metadata for this destination onto the payload"""
+        for key in ("index", "source", "sourcetype"):
+            value = getattr(self, key)
+            if value:
+                payload[key] = value
+        return payload
+
+
+class RoutingRule:
+    """
+    Routes events whose fields match every entry in `match` to a destination.
+    A match value may be a single value or a list of accepted values.
+    """
+    def __init__(self, destination: str, match: Dict[str, Any], endpoint: Optional[str] = None):
+        self.destination = destination
+        self.endpoint = endpoint
+        self.match = {
+            key: set(value) if isinstance(value, (list, tuple, set)) else {value}
+            for key, value in match.items()
+        }
+
+    def matches(self, fields: Dict[str, Any]) -> bool:
+        for key, accepted in self.match.items():
+            value = fields.get(key)
+            try:
+                if value not in accepted:
+                    return False
+            except TypeError:  # unhashable field values never match
+                return False
+        return True
+
+
+class Router:
+    """Evaluates routing rules per event, falling back to the default destination"""
+    def __init__(self, default: Destination, destinations: Optional[Dict[str, Destination]] = None,
+                 rules: Optional[List[RoutingRule]] = None):
+        # A configured destination with the default's name replaces the default
+        self.destinations = {default.name: default, **(destinations or {})}
+        self.default = self.destinations[default.name]
+        self.rules = rules or []
+
+        for rule in self.rules:
+            if rule.destination not in self.destinations:
+                raise ValueError(f"Unknown routing destination: {rule.destination}")
+
+    def route(self, payload: Dict[str, Any]) -> Destination:
+        if not self.rules:
+            return self.default
+
+        # Events carry their fields in "event", metrics in "fields"
+        fields = payload.get("event")
+        if not isinstance(fields, dict):
+            fields = payload.get("fields") or {}
+
+        for rule in self.rules:
+            if rule.matches(fields):
+                return self.destinations[rule.destination]
+        return self.default
+
+    @property
+    def min_linger_ms(self) -> int:
+        """Shortest non-zero linger - linger-0 batches are sent as soon as they are queued"""
+        return min((d.linger_ms for d in self.destinations.values() if d.linger_ms), default=0)
+
+    @classmethod
+    def from_config(cls, config: Any, endpoint: str) -> 'Router':
+        """
+        Build a router for the given endpoint type. SPLUNK_ROUTES is a JSON
+        document of the form:
+
+            {"destinations": {"audit": {"index": "audit", "token": "...", "batch_size": 50}},
+             "rules": [{"match": {"category": "audit"}, "destination": "audit"}]}
+
+        Destinations without a token use the endpoint's token, and rules
+        without an "endpoint" key apply to both events and metrics. A
+        destination named "events" or "metrics" overrides that default,
+        keeping the default's settings for any it doesn't set.
+        """
+        if endpoint == "metric":
+            token = config.SPLUNK_METRICS_TOKEN
+            default = Destination(DEFAULT_DESTINATIONS[endpoint], token=token, source="metrics", sourcetype="perflog",
+                                  batch_size=config.SPLUNK_BATCH_SIZE,
+                                  linger_ms=config.SPLUNK_LINGER_MS)
+        else:
+            token = config.SPLUNK_EVENTS_TOKEN
+            default = Destination(DEFAULT_DESTINATIONS["event"], token=token, sourcetype="_json",
+                                  batch_size=config.SPLUNK_BATCH_SIZE,
+                                  linger_ms=config.SPLUNK_LINGER_MS)
+
+        if not config.SPLUNK_ROUTES:
+            return cls(default)
+
+        routes = parse_routes(config.SPLUNK_ROUTES)
+
+        destinations = {}
+        for name, settings in routes["destinations"].items():
+            base = default if name == default.name else Destination(
+                name, token=token,
+                batch_size=config.SPLUNK_BATCH_SIZE,
+                linger_ms=config.SPLUNK_LINGER_MS
+            )
+            destinations[name] = Destination(
+                name,
+                token=settings.get("token") or base.token,
+                index=settings.get("index", base.index),
+                source=settings.get("source", base.source),
+                sourcetype=settings.get("sourcetype", base.sourcetype),
+                batch_size=int(settings.get("batch_size", base.batch_size)),
+                linger_ms=int(settings.get("linger_ms", base.linger_ms)),
+            )
+
+        rules = [
+            RoutingRule(rule["destination"], rule["match"], rule.get("endpoint"))
+            for rule in routes["rules"]
+            if rule.get("endpoint") in (None, endpoint)
+        ]
+
+        return cls(default, destinations, rules)
@@ -1,10 +1,26 @@
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+import atexit
+import json
 import logging
-from typing import Dict, Any, Optional
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from .config import Config
+from .file_sink import FileSink
+from .routing import Destination, Router
 import os
+
+class _EventBuffer:
+    """Pre-serialized NDJSON events for one destination in a single contiguous buffer"""
+    __slots__ = ("data", "count", "started")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.count = 0
+        self.started = time.monotonic()
+
 class SplunkBase:
     def __init__(self, endpoint: str = "event"):
         self.config = Config()
@@ -25,11 +41,65 @@ class SplunkBase:
             "Content-Type": "application/json"
         }
         
-        # Setup session with retry logic
-        self.session = self._setup_session()
+        # Routing rules and per-destination batch queues
+        self.router = Router.from_config(self.config, endpoint)
+        self._queues: Dict[str, _EventBuffer] = {}
+        self._ready: List[Tuple[Destination, _EventBuffer]] = []  # full batches awaiting the flusher
+        self._queue_lock = threading.Lock()
+        
+        # Memory accounting covers queued and in-flight batches
+        self._queued_bytes = 0
+        self._queued_events = 0
+        self._dropped_events = 0
+        self._dropping = False
+        
+        # Start the flusher before anything that can fail, so queued events
+        # are still sent if the transport setup or connection check raises
+        self.session = None
+        self.file_sink = None
+        self._wake_flusher = threading.Event()
+        self._start_flusher()
+        atexit.register(self.flush)
+        os.register_at_fork(after_in_child=self._after_fork)
+        
+        # Select transport - the file transport never touches the network
+        self.transport = (self.config.SPLUNK_METRICS_TRANSPORT
+                         if endpoint == "metric"
+                         else self.config.SPLUNK_EVENTS_TRANSPORT)
+        
+        if self.transport == "file":
+            self.file_sink = FileSink.from_config(self.config, endpoint)
+        else:
+            # Setup session with retry logic
+            self.session = self._setup_session()
+            
+            # Validate connection
+            self._validate_connection()
+
+    def _start_flusher(self) -> None:
+        """Background flusher sends batches once their linger time expires"""
+        self._flusher = threading.Thread(
+            target=self._flush_loop,
+            name=f"splunk-{self.endpoint}-flusher",
+            daemon=True
+        )
+        self._flusher.start()
+
+    def _after_fork(self) -> None:
+        """Give a forked child empty queues and its own flusher - the parent sends what it queued"""
+        self._queue_lock = threading.Lock()
+        self._queues = {}
+        self._ready = []
+        self._queued_bytes = 0
+        self._queued_events = 0
+        self._dropped_events = 0
+        self._dropping = False
+        self._wake_flusher = threading.Event()
+        self._start_flusher()
         
-        # Validate connection
-        self._validate_connection()
+        # Pooled connections can't be shared with the parent
+        if self.session:
+            self.session = self._setup_session()
 
     def _setup_session(self) -> requests.Session:
         """Configure session with minimal retry logic"""
@@ -47,14 +117,127 @@ class SplunkBase:
         
         return session
 
+    def _enqueue(self, payload: Dict[str, Any]) -> None:
+        """
+        Route a payload to its destination queue as serialized NDJSON. Events
+        are dropped once MAX_QUEUE_BYTES or MAX_QUEUE_SIZE would be exceeded.
+        """
+        destination = self.router.route(payload)
+        destination.apply(payload)
+        data = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+        
+        batch = None
+        first_drop = False
+        with self._queue_lock:
+            if (self._queued_bytes + len(data) > self.config.MAX_QUEUE_BYTES
+                    or self._queued_events >= self.config.MAX_QUEUE_SIZE):
+                self._dropped_events += 1
+                first_drop = not self._dropping
+                self._dropping = True
+            else:
+                self._dropping = False
+                queue = self._queues.get(destination.name)
+                if queue is None:
+                    queue = self._queues[destination.name] = _EventBuffer()
+                queue.data += data
+                queue.count += 1
+                self._queued_bytes += len(data)
+                self._queued_events += 1
+                
+                if queue.count >= destination.batch_size or destination.linger_ms == 0:
+                    batch = self._queues.pop(destination.name)
+                    if self.config.ENABLE_ASYNC:
+                        # Hand off to the flusher so a slow HEC never blocks the caller
+                        self._ready.append((destination, batch))
+                        batch = None
+                        self._wake_flusher.set()
+                        
+        if first_drop:
+            logging.getLogger('splunk_fallback').warning(
+                f"Splunk queue full ({self._queued_bytes} bytes, {self._queued_events} events), "
+                f"dropping events for {destination.name}"
+            )
+        if batch:
+            self._send_batch(destination, batch)
+
+    def flush(self, expired_only: bool = False) -> None:
+        """Send queued batches - all of them, or only those full or past their linger time"""
+        now = time.monotonic()
+        with self._queue_lock:
+            batches = self._ready
+            self._ready = []
+            names = [
+                name for name, queue in self._queues.items()
+                if not expired_only
+                or now - queue.started >= self.router.destinations[name].linger_ms / 1000
+            ]
+            batches += [(self.router.destinations[name], self._queues.pop(name)) for name in names]
+            
+        error = None
+        for destination, batch in batches:
+            try:
+                self._send_batch(destination, batch)
+            except Exception as e:
+                error = e
+        if error:
+            raise error
+
+    def queue_stats(self) -> Dict[str, Any]:
+        """Report queue memory usage, overall and per destination"""
+        with self._queue_lock:
+            destinations: Dict[str, Dict[str, int]] = {}
+            pending = [(name, queue) for name, queue in self._queues.items()]
+            pending += [(destination.name, batch) for destination, batch in self._ready]
+            for name, queue in pending:
+                stats = destinations.setdefault(name, {"events": 0, "bytes": 0})
+                stats["events"] += queue.count
+                stats["bytes"] += len(queue.data)
+                
+            return {
+                "queued_events": self._queued_events,
+                "queued_bytes": self._queued_bytes,
+                "dropped_events": self._dropped_events,
+                "max_queue_size": self.config.MAX_QUEUE_SIZE,
+                "max_queue_bytes": self.config.MAX_QUEUE_BYTES,
+                "destinations": destinations
+            }
+
+    def _flush_loop(self) -> None:
+        # Without a lingering destination the flusher only wakes for handed-off batches
+        min_linger_ms = self.router.min_linger_ms
+        interval = max(min_linger_ms / 2, 10) / 1000 if min_linger_ms else None
+        while True:
+            self._wake_flusher.wait(interval)
+            self._wake_flusher.clear()
+            try:
+                self.flush(expired_only=True)
+            except Exception as e:
+                logging.getLogger('splunk_fallback').error(f"Failed to flush Splunk batch: {str(e)}")
+
+    def _send_batch(self, destination: Destination, batch: _EventBuffer) -> None:
+        """Send a batch to a destination - HEC accepts concatenated events in one request"""
+        try:
+            if self.file_sink:
+                self.file_sink.write_bytes(batch.data)
+            else:
+                self._post(bytes(batch.data), destination.headers)
+        finally:
+            with self._queue_lock:
+                self._queued_bytes -= len(batch.data)
+                self._queued_events -= batch.count
+
     def _send_to_splunk(self, payload: Dict[str, Any]) -> None:
-        """Send data to Splunk with detailed error handling"""
+        """Send a single payload to Splunk immediately, bypassing the batch queues"""
         print(payload)
+        self._post(json.dumps(payload, default=str).encode("utf-8"), self.headers)
+
+    def _post(self, body: bytes, headers: Dict[str, str]) -> None:
+        """Post a request body to HEC with detailed error handling"""
         try:
             response = self.session.post(
                 self.hec_url,
-                headers=self.headers,
-                json=payload,
+                headers=headers,
+                data=body,
                 verify=self.config.SPLUNK_VERIFY_SSL,
                 timeout=self.config.SPLUNK_TIMEOUT
             )
@@ -66,7 +249,7 @@ class SplunkBase:
             URL: {self.hec_url}
             Response: {getattr(e.response, 'text', 'No response')}
             Status Code: {getattr(e.response, 'status_code', 'No status code')}
-            Payload: {payload}
+            Payload: {body.decode("utf-8", errors="replace")}
             """
             raise RuntimeError(error_msg) from e
 
@@ -71,12 +71,12 @@ class SafeSplunkLogger(SplunkBase):
                     **additional_fields
                 }
                 
+                # Index/sourcetype come from the routed destination
                 payload = {
-                    "event": event_data,
-                    "sourcetype": "_json"
+                    "event": event_data
                 }
             
-            self._send_to_splunk(payload)
+            self._enqueue(payload)
         except Exception as e:
             error_msg = f"""
             Splunk logging failed:
@@ -89,6 +89,19 @@ class SafeSplunkLogger(SplunkBase):
             # Also log to fallback logger
             self._log_fallback(error_msg)
 
+    def flush(self, expired_only: bool = False) -> None:
+        try:
+            super().flush(expired_only=expired_only)
+        except Exception as e:
+            self._log_fallback(f"Failed to flush Splunk batch: {str(e)}")
+
+    def queue_stats(self) -> Dict[str, Any]:
+        try:
+            return super().queue_stats()
+        except Exception as e:
+            self._log_fallback(f"Failed to read Splunk queue stats: {str(e)}")
+            return {}
+
     def _log_fallback(self, error_message: str) -> None:
         """Fallback logging to stderr when Splunk logging fails"""
         fallback_logger = logging.getLogger('splunk_fallback')
@@ -22,8 +22,6 @@ class MetricEmitter(BaseLogger):
         metric = {
             "time": datetime.now(timezone.utc).timestamp(),
             "event": "metric",
-            "source": "metrics",
-            "sourcetype": "perflog",
             "fields": {
                 **enriched_context,
                 f"metric_name:{metric_name}": float(value)
@@ -32,6 +30,10 @@ class MetricEmitter(BaseLogger):
         
         self.splunk_logger.log(metric)
     
+    def queue_stats(self) -> Dict[str, Any]:
+        """Report memory usage of the Splunk queues"""
+        return self.splunk_logger.queue_stats()
+    
     def _flush_metrics(self, metric_name: Optional[str] = None) -> None:
         """Flush metrics to Splunk"""
         try:
@@ -47,6 +49,9 @@ class MetricEmitter(BaseLogger):
                             self.splunk_logger.log(metric)
                 self._batch.clear()
                 
+            # Send anything still queued for routed destinations
+            self.splunk_logger.flush()
+                
         except Exception as e:
             from . import logger  # Import here to avoid circular import
             logger.error(f"Failed to flush metrics", exc_info=e)
@@ -0,0 +1,123 @@
+import gzip
+import json
+import os
+import threading
+import time
+from logging_handler.file_sink import FileSink
+
+
+def _line(payload):
+    return json.dumps(payload).encode("utf-8") + b"\n"
+
+
+def test_file_sink_writes_ndjson(tmp_path, test_context):
+    """Test that payloads are written as one JSON object per line"""
+    sink = FileSink(str(tmp_path), "events")
+    
+    for i in range(3):
+        sink.write_bytes(_line({"event": {"message": f"event {i}", **test_context}, "sourcetype": "_json"}))
+    sink.flush()
+    
+    with open(sink.path) as f:
+        lines = [json.loads(line) for line in f]
+    
+    assert len(lines) == 3
+    assert lines[0]["event"]["message"] == "event 0"
+    assert lines[2]["sourcetype"] == "_json"
+    sink.close()
+
+def test_file_sink_periodic_flush(tmp_path):
+    """Test that buffered events reach the file without close() or a full buffer"""
+    sink = FileSink(str(tmp_path), "events", flush_interval=0.1)
+    
+    for i in range(5):
+        sink.write_bytes(_line({"event": {"message": f"flushed event {i}"}}))
+    time.sleep(0.5)
+    
+    with open(sink.path) as f:
+        assert len(f.readlines()) == 5
+    sink.close()
+
+def test_file_sink_rotation_and_compression(tmp_path):
+    """Test size-based rotation with gzip of rotated segments"""
+    sink = FileSink(str(tmp_path), "events", max_bytes=200, compress=True)
+    
+    for i in range(20):
+        sink.write_bytes(_line({"event": {"message": f"rotating event {i}"}}))
+    sink.close()
+    
+    rotated = [name for name in os.listdir(tmp_path) if name.endswith(".ndjson.gz")]
+    assert rotated, "Expected at least one compressed segment"
+    
+    with gzip.open(os.path.join(tmp_path, rotated[0]), "rt") as f:
+        assert json.loads(f.readline())["event"]["message"].startswith("rotating event")
+
+def test_file_sink_disk_budget(tmp_path):
+    """Test that the oldest segments are removed once over budget"""
+    sink = FileSink(str(tmp_path), "events", max_bytes=200, max_total_bytes=1000)
+    
+    for i in range(200):
+        sink.write_bytes(_line({"event": {"message": f"budget event {i}"}}))
+    sink.close()
+    
+    total = sum(os.path.getsize(os.path.join(tmp_path, name)) for name in os.listdir(tmp_path))
+    assert total <= 1000 + 200
+
+def test_file_sink_shared_per_path(tmp_path):
+    """Test that sinks for the same path are shared within a process"""
+    sink = FileSink.get(str(tmp_path), "events")
+    
+    assert FileSink.get(str(tmp_path), "events") is sink
+    assert FileSink.get(str(tmp_path), "metrics") is not sink
+    assert os.path.basename(sink.path) == f"events-{os.getpid()}.ndjson"
+    sink.close()
+
+def _read_segments(directory):
+    events = []
+    for name in os.listdir(directory):
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(os.path.join(directory, name), "rt") as f:
+            events += [json.loads(line) for line in f]
+    return events
+
+def test_file_sink_multiple_processes(tmp_path):
+    """Test that forked writers rotate and compress their own segments"""
+    sink = FileSink(str(tmp_path), "events", max_bytes=300, compress=True)
+    
+    pids = []
+    for worker in range(2):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                for i in range(20):
+                    sink.write_bytes(_line({"event": {"message": f"worker {worker} event {i}"}}))
+                sink.close()
+            finally:
+                os._exit(0)
+        pids.append(pid)
+    
+    for i in range(20):
+        sink.write_bytes(_line({"event": {"message": f"parent event {i}"}}))
+    for pid in pids:
+        os.waitpid(pid, 0)
+    sink.close()
+    
+    assert len(_read_segments(tmp_path)) == 60
+
+def test_file_sink_compresses_in_background(tmp_path, monkeypatch):
+    """Test that rotation on the writing thread doesn't compress segments"""
+    sink = FileSink(str(tmp_path), "events", max_bytes=200, compress=True, flush_interval=0)
+    writer = threading.current_thread()
+    compressed_on = []
+    compress = sink._compress
+    monkeypatch.setattr(sink, "_compress", lambda path: (compressed_on.append(threading.current_thread()), compress(path)))
+    
+    for i in range(20):
+        sink.write_bytes(_line({"event": {"message": f"background event {i}"}}))
+    time.sleep(0.5)
+    
+    assert compressed_on
+    assert writer not in compressed_on
+    assert any(name.endswith(".ndjson.gz") for name in os.listdir(tmp_path))
+    sink.close()
+    assert len(_read_segments(tmp_path)) == 20
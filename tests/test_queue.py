@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+import time
+import pytest
+from logging_handler.splunk_base import SplunkBase
+from logging_handler.splunk_logger import SafeSplunkLogger
+
+
+@pytest.fixture
+def file_transport(tmp_path, monkeypatch):
+    monkeypatch.setenv("SPLUNK_EVENTS_TRANSPORT", "file")
+    monkeypatch.setenv("FILE_SINK_DIR", str(tmp_path))
+    monkeypatch.setenv("SPLUNK_BATCH_SIZE", "1000")
+    monkeypatch.setenv("SPLUNK_LINGER_MS", "60000")
+    monkeypatch.setenv("SPLUNK_ROUTES", "")
+    return tmp_path
+
+def test_queue_stats(file_transport, test_context):
+    """Test that queued events are reported by bytes and destination"""
+    splunk = SafeSplunkLogger()
+    
+    for i in range(5):
+        splunk.log(f"queued event {i}", **test_context)
+    
+    stats = splunk.queue_stats()
+    assert stats["queued_events"] == 5
+    assert stats["destinations"]["events"]["events"] == 5
+    assert stats["queued_bytes"] == stats["destinations"]["events"]["bytes"] > 0
+    
+    splunk.flush()
+    assert splunk.queue_stats()["queued_bytes"] == 0
+    
+    splunk.file_sink.flush()
+    with open(splunk.file_sink.path) as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["event"]["message"] for line in lines] == [f"queued event {i}" for i in range(5)]
+
+def test_queue_byte_limit(file_transport, monkeypatch):
+    """Test that events are dropped once the byte limit is reached"""
+    monkeypatch.setenv("MAX_QUEUE_BYTES", "2048")
+    splunk = SafeSplunkLogger()
+    
+    for i in range(100):
+        splunk.log("x" * 100, iteration=i)
+    
+    stats = splunk.queue_stats()
+    assert 0 < stats["queued_bytes"] <= 2048
+    assert stats["dropped_events"] == 100 - stats["queued_events"]
+    splunk.flush()
+
+def test_queue_count_limit(file_transport, monkeypatch):
+    """Test that events are dropped once MAX_QUEUE_SIZE events are queued"""
+    monkeypatch.setenv("MAX_QUEUE_SIZE", "10")
+    splunk = SafeSplunkLogger()
+    
+    for i in range(25):
+        splunk.log("counted event", iteration=i)
+    
+    stats = splunk.queue_stats()
+    assert stats["queued_events"] == 10
+    assert stats["dropped_events"] == 15
+    splunk.flush()
+
+@pytest.fixture
+def hec_transport(monkeypatch):
+    monkeypatch.setattr(SplunkBase, "_validate_connection", lambda self: None)
+    monkeypatch.setenv("SPLUNK_EVENTS_TRANSPORT", "hec")
+    monkeypatch.setenv("SPLUNK_BATCH_SIZE", "2")
+    monkeypatch.setenv("SPLUNK_LINGER_MS", "60000")
+    monkeypatch.setenv("SPLUNK_ROUTES", "")
+
+def test_queue_accounting_after_failed_send(hec_transport, monkeypatch):
+    """Test that a failed send releases its bytes and events from the queue"""
+    def fail(self, body, headers):
+        raise RuntimeError("HEC unavailable")
+    monkeypatch.setattr(SplunkBase, "_post", fail)
+    splunk = SplunkBase(endpoint="event")
+    
+    splunk._enqueue({"event": {"message": "first"}})
+    with pytest.raises(RuntimeError):
+        splunk._enqueue({"event": {"message": "second"}})
+    
+    stats = splunk.queue_stats()
+    assert stats["queued_bytes"] == 0
+    assert stats["queued_events"] == 0
+
+def test_async_batches_sent_by_flusher(hec_transport, monkeypatch):
+    """Test that with ENABLE_ASYNC the caller never sends a full batch itself"""
+    monkeypatch.setenv("ENABLE_ASYNC", "true")
+    senders = []
+    monkeypatch.setattr(SplunkBase, "_post",
+                        lambda self, body, headers: senders.append((threading.current_thread(), body)))
+    splunk = SplunkBase(endpoint="event")
+    
+    splunk._enqueue({"event": {"message": "first"}})
+    splunk._enqueue({"event": {"message": "second"}})
+    
+    deadline = time.monotonic() + 2
+    while not senders and time.monotonic() < deadline:
+        time.sleep(0.01)
+    
+    assert len(senders) == 1
+    thread, body = senders[0]
+    assert thread is splunk._flusher
+    assert [json.loads(line)["event"]["message"] for line in body.splitlines()] == ["first", "second"]
+    assert splunk.queue_stats()["queued_events"] == 0
+
+def test_async_after_failed_connection_check(monkeypatch):
+    """Test that async hand-off works when HEC was down at startup"""
+    senders = []
+    def post_after_first(self, body, headers):
+        senders.append((threading.current_thread(), body))
+        if len(senders) == 1:
+            raise RuntimeError("HEC unavailable")
+    monkeypatch.setattr(SplunkBase, "_post", post_after_first)
+    monkeypatch.setenv("SPLUNK_EVENTS_TRANSPORT", "hec")
+    monkeypatch.setenv("ENABLE_ASYNC", "true")
+    monkeypatch.setenv("SPLUNK_BATCH_SIZE", "2")
+    monkeypatch.setenv("SPLUNK_LINGER_MS", "60000")
+    monkeypatch.setenv("SPLUNK_ROUTES", "")
+    splunk = SafeSplunkLogger()
+    
+    splunk.log("first")
+    splunk.log("second")
+    
+    deadline = time.monotonic() + 2
+    while len(senders) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    
+    assert len(senders) == 2
+    thread, body = senders[1]
+    assert thread is splunk._flusher
+    assert [json.loads(line)["event"]["message"] for line in body.splitlines()] == ["first", "second"]
+    
+    stats = splunk.queue_stats()
+    assert (stats["queued_events"], stats["queued_bytes"]) == (0, 0)
+
+def test_forked_child_queues(file_transport, monkeypatch):
+    """Test that a forked child starts with empty queues and a running flusher"""
+    monkeypatch.setenv("SPLUNK_LINGER_MS", "200")
+    splunk = SafeSplunkLogger()
+    
+    splunk.log("parent event 0")
+    splunk.log("parent event 1")
+    
+    pid = os.fork()
+    if pid == 0:
+        ok = False
+        try:
+            ok = splunk.queue_stats()["queued_events"] == 0 and splunk._flusher.is_alive()
+            splunk.log("child event")
+            time.sleep(1)  # sent by the child's flusher once its linger expires
+            ok = ok and splunk.queue_stats()["queued_events"] == 0
+            
+            splunk.flush()
+            splunk.file_sink.flush()
+            with open(splunk.file_sink.path) as f:
+                ok = ok and [json.loads(line)["event"]["message"] for line in f] == ["child event"]
+        finally:
+            os._exit(0 if ok else 1)
+    
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    
+    splunk.flush()
+    splunk.file_sink.flush()
+    with open(splunk.file_sink.path) as f:
+        assert [json.loads(line)["event"]["message"] for line in f] == ["parent event 0", "parent event 1"]
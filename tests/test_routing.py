@@ -0,0 +1,202 @@
+import json
+import time
+import pytest
+import requests
+from logging_handler.config import Config
+from logging_handler.routing import Destination, Router, RoutingRule
+from logging_handler.splunk_base import SplunkBase
+from logging_handler.splunk_logger import SafeSplunkLogger
+
+
+class _Response:
+    def raise_for_status(self):
+        pass
+
+@pytest.fixture
+def hec_posts(monkeypatch):
+    """Record HEC requests instead of sending them"""
+    posts = []
+    monkeypatch.setattr(SplunkBase, "_validate_connection", lambda self: None)
+    monkeypatch.setattr(requests.Session, "post",
+                        lambda self, url, **kwargs: posts.append(kwargs) or _Response())
+    monkeypatch.setenv("SPLUNK_EVENTS_TRANSPORT", "hec")
+    monkeypatch.setenv("ENABLE_ASYNC", "false")
+    return posts
+
+def _events(post):
+    return [json.loads(line) for line in post["data"].splitlines()]
+
+
+def test_default_destinations():
+    """Test that unrouted events keep the existing sourcetypes"""
+    config = Config()
+    config.SPLUNK_ROUTES = None
+    
+    event = Router.from_config(config, "event").route({"event": {"level": "info"}})
+    assert event.sourcetype == "_json"
+    assert event.token == config.SPLUNK_EVENTS_TOKEN
+    
+    metric = Router.from_config(config, "metric").route({"event": "metric", "fields": {}})
+    assert (metric.source, metric.sourcetype) == ("metrics", "perflog")
+    assert metric.token == config.SPLUNK_METRICS_TOKEN
+
+def test_routing_rules(test_context):
+    """Test per-event routing to destinations with their own batching settings"""
+    config = Config()
+    config.SPLUNK_ROUTES = json.dumps({
+        "destinations": {
+            "audit": {"index": "audit", "sourcetype": "audit:json", "token": "audit-token",
+                      "batch_size": 50, "linger_ms": 200},
+            "debug": {"index": "debug", "batch_size": 500}
+        },
+        "rules": [
+            {"match": {"category": "audit"}, "destination": "audit"},
+            {"match": {"level": "debug"}, "destination": "debug", "endpoint": "event"}
+        ]
+    })
+    router = Router.from_config(config, "event")
+    
+    audit = router.route({"event": {"level": "info", "category": "audit", **test_context}})
+    assert audit.name == "audit"
+    assert audit.batch_size == 50
+    assert audit.headers["Authorization"] == "Splunk audit-token"
+    assert audit.apply({"event": {}}) == {"event": {}, "index": "audit", "sourcetype": "audit:json"}
+    
+    debug = router.route({"event": {"level": "debug"}})
+    assert debug.name == "debug"
+    assert debug.token == config.SPLUNK_EVENTS_TOKEN
+    
+    assert router.route({"event": {"level": "info"}}).name == "events"
+    
+    # Event-only rules don't apply to metrics
+    metric_router = Router.from_config(config, "metric")
+    assert metric_router.route({"event": "metric", "fields": {"level": "debug"}}).name == "metrics"
+    assert metric_router.route({"event": "metric", "fields": {"category": "audit"}}).name == "audit"
+
+def test_default_destination_override():
+    """Test that a destination named after the default replaces it everywhere"""
+    config = Config()
+    config.SPLUNK_ROUTES = json.dumps({
+        "destinations": {"events": {"index": "main", "token": "override-token"}},
+        "rules": [{"match": {"category": "audit"}, "destination": "events"}]
+    })
+    router = Router.from_config(config, "event")
+    
+    default = router.route({"event": {"level": "info"}})
+    assert default is router.destinations["events"]
+    assert (default.index, default.token) == ("main", "override-token")
+    assert default.sourcetype == "_json"
+
+def test_rule_match_values():
+    """Test matching on lists of accepted values"""
+    rule = RoutingRule("security", {"level": ["warning", "error"], "team": "sec"})
+    
+    assert rule.matches({"level": "error", "team": "sec"})
+    assert not rule.matches({"level": "info", "team": "sec"})
+    assert not rule.matches({"level": "error"})
+    assert not rule.matches({"level": ["error"], "team": "sec"})
+
+@pytest.mark.parametrize("routes", [
+    "not json",
+    "[]",
+    '{"destinations": []}',
+    '{"destinations": {"audit": {"batch_size": "big"}}}',
+    '{"destinations": {"audit": {"idx": "audit"}}}',
+    '{"rules": [{"match": {"category": "audit"}}]}',
+    '{"destinations": {"audit": {}}, "rules": [{"match": {"category": {"a": 1}}, "destination": "audit"}]}',
+    '{"rules": [{"match": {}, "destination": "events"}]}',
+    '{"destinations": {"audit": {}}, "rules": [{"destination": "audit", "endpoint": "log"}]}',
+])
+def test_invalid_routes(monkeypatch, routes):
+    """Test that a malformed SPLUNK_ROUTES fails config validation"""
+    monkeypatch.setenv("SPLUNK_ROUTES", routes)
+    with pytest.raises(ValueError):
+        Config()
+
+def test_min_linger_ignores_immediate_destinations():
+    """Test that linger-0 destinations don't shorten the flusher poll interval"""
+    router = Router(Destination("events", linger_ms=1000),
+                    {"audit": Destination("audit", linger_ms=0)})
+    assert router.min_linger_ms == 1000
+    
+    assert Router(Destination("events", linger_ms=0)).min_linger_ms == 0
+
+def test_unknown_destination():
+    """Test that rules must point at a configured destination"""
+    with pytest.raises(ValueError):
+        Router(Destination("events"), rules=[RoutingRule("missing", {})])
+
+def test_per_destination_batching(hec_posts, monkeypatch):
+    """Test that each destination sends one request per batch with its own settings"""
+    monkeypatch.setenv("SPLUNK_BATCH_SIZE", "100")
+    monkeypatch.setenv("SPLUNK_LINGER_MS", "60000")
+    monkeypatch.setenv("SPLUNK_ROUTES", json.dumps({
+        "destinations": {
+            "audit": {"index": "audit", "token": "audit-token", "batch_size": 2},
+            "debug": {"index": "debug", "token": "debug-token", "batch_size": 100, "linger_ms": 300}
+        },
+        "rules": [
+            {"match": {"category": "audit"}, "destination": "audit"},
+            {"match": {"level": "debug"}, "destination": "debug"}
+        ]
+    }))
+    splunk = SplunkBase(endpoint="event")
+    
+    for i in range(3):
+        splunk._enqueue({"event": {"level": "info", "category": "audit", "i": i}})
+    for i in range(2):
+        splunk._enqueue({"event": {"level": "debug", "i": i}})
+    splunk.flush(expired_only=True)
+    
+    # Only the audit batch is full, and it goes out as one request
+    assert len(hec_posts) == 1
+    assert hec_posts[0]["headers"]["Authorization"] == "Splunk audit-token"
+    assert [e["event"]["i"] for e in _events(hec_posts[0])] == [0, 1]
+    assert all(e["index"] == "audit" for e in _events(hec_posts[0]))
+    
+    # The debug batch is sent by the flusher once its linger expires
+    time.sleep(1)
+    assert len(hec_posts) == 2
+    assert hec_posts[1]["headers"]["Authorization"] == "Splunk debug-token"
+    assert [e["event"]["i"] for e in _events(hec_posts[1])] == [0, 1]
+    
+    # The remaining audit event waits for an explicit flush
+    splunk.flush()
+    assert len(hec_posts) == 3
+    assert [e["event"]["i"] for e in _events(hec_posts[2])] == [2]
+
+def test_default_destination_batching(hec_posts, monkeypatch):
+    """Test that unrouted events are batched with the endpoint token and sourcetype"""
+    monkeypatch.setenv("SPLUNK_BATCH_SIZE", "5")
+    monkeypatch.setenv("SPLUNK_LINGER_MS", "60000")
+    monkeypatch.setenv("SPLUNK_ROUTES", "")
+    splunk = SplunkBase(endpoint="event")
+    
+    for i in range(10):
+        splunk._enqueue({"event": {"level": "info", "i": i}})
+    
+    assert len(hec_posts) == 2
+    assert hec_posts[0]["headers"]["Authorization"] == f"Splunk {splunk.config.SPLUNK_EVENTS_TOKEN}"
+    assert [e["sourcetype"] for e in _events(hec_posts[1])] == ["_json"] * 5
+
+def test_linger_flush_after_failed_connection_check(monkeypatch):
+    """Test that queued events are still sent when HEC was down at startup"""
+    posts = []
+    def post_after_first(self, body, headers):
+        posts.append(body)
+        if len(posts) == 1:
+            raise RuntimeError("HEC unavailable")
+    monkeypatch.setattr(SplunkBase, "_post", post_after_first)
+    monkeypatch.setenv("SPLUNK_EVENTS_TRANSPORT", "hec")
+    monkeypatch.setenv("ENABLE_ASYNC", "false")
+    monkeypatch.setenv("SPLUNK_BATCH_SIZE", "100")
+    monkeypatch.setenv("SPLUNK_LINGER_MS", "200")
+    monkeypatch.setenv("SPLUNK_ROUTES", "")
+    splunk = SafeSplunkLogger()
+    
+    splunk.log("queued while HEC was down")
+    time.sleep(1)
+    
+    assert len(posts) == 2
+    assert json.loads(posts[1])["event"]["message"] == "queued while HEC was down"
+    assert splunk.queue_stats()["queued_events"] == 0